@@ -10,55 +10,74 @@ Este sistema utiliza lógica difusa (fuzzy logic) para determinar la duración
 
 Salida: Duración del riego en minutos (0-30 min)
 
+Los módulos pesados (matplotlib a través de utils.visualization, y Numba a
+través de system.fast_controller) se importan de forma diferida en el punto de
+uso, de modo que el arranque y las opciones que no grafican no pagan su carga.
+
 Autor: Equipo PRY4-LM
 Fecha: Noviembre 2025
 """
 
+import hashlib
 import sys
 import os
 
+import numpy as np
+
 # Añadir el directorio src al path para importar módulos
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from system.variables import define_universes
 from system.membership_functions import define_memberships
 from system.rules import define_rules
-from system.controller import build_system, simulate_irrigation, get_system_info
-from utils.inputs import get_sample_inputs, get_extreme_cases, get_custom_input
-from utils.visualization import (plot_memberships, plot_surface, 
-                                  plot_simulation_result, plot_multiple_simulations)
-from utils.data_logger import DataLogger
+from system.controller import (build_system, simulate_irrigation, simulate_irrigation_batch,
+                               get_system_info, model_signature)
+from utils.inputs import (Samples, get_sample_inputs, get_extreme_cases, get_custom_input,
+                          validate_input, validate_inputs_batch)
+
+# Nota: utils.visualization (matplotlib) y utils.data_logger se importan dentro
+# de las opciones que los usan, para no pagar su carga al iniciar el programa.
+
+
+# Textos fijos de la interfaz, construidos una sola vez al cargar el módulo
+_HEADER = (
+    "\n" + "="*70 + "\n"
+    + " "*10 + "SISTEMA DE CONTROL DIFUSO PARA RIEGO DE INVERNADERO\n"
+    + "="*70 + "\n"
+    "Variables de Entrada:\n"
+    "  • Humedad del Suelo: 0-100%\n"
+    "  • Temperatura Ambiente: 0-40°C\n"
+    "  • Radiación Solar: 0-1000 W/m²\n"
+    "\nVariable de Salida:\n"
+    "  • Duración del Riego: 0-30 minutos\n"
+    + "="*70 + "\n\n"
+)
+
+_MENU = (
+    "\n" + "─"*70 + "\n"
+    "MENÚ DE OPCIONES\n"
+    + "─"*70 + "\n"
+    "1. Ejecutar casos de prueba predefinidos\n"
+    "2. Ejecutar casos extremos\n"
+    "3. Ingresar valores personalizados\n"
+    "4. Visualizar funciones de pertenencia\n"
+    "5. Visualizar superficie de control 3D\n"
+    "6. Visualizar resultado de simulación específica\n"
+    "7. Ver información del sistema\n"
+    "8. Ver resumen de sesión actual\n"
+    "0. Salir\n"
+    + "─"*70 + "\n"
+)
 
 
 def print_header():
     """Imprime el encabezado del programa."""
-    print("\n" + "="*70)
-    print(" "*10 + "SISTEMA DE CONTROL DIFUSO PARA RIEGO DE INVERNADERO")
-    print("="*70)
-    print("Variables de Entrada:")
-    print("  • Humedad del Suelo: 0-100%")
-    print("  • Temperatura Ambiente: 0-40°C")
-    print("  • Radiación Solar: 0-1000 W/m²")
-    print("\nVariable de Salida:")
-    print("  • Duración del Riego: 0-30 minutos")
-    print("="*70 + "\n")
+    sys.stdout.write(_HEADER)
 
 
 def print_menu():
     """Imprime el menú de opciones."""
-    print("\n" + "─"*70)
-    print("MENÚ DE OPCIONES")
-    print("─"*70)
-    print("1. Ejecutar casos de prueba predefinidos")
-    print("2. Ejecutar casos extremos")
-    print("3. Ingresar valores personalizados")
-    print("4. Visualizar funciones de pertenencia")
-    print("5. Visualizar superficie de control 3D")
-    print("6. Visualizar resultado de simulación específica")
-    print("7. Ver información del sistema")
-    print("8. Ver resumen de sesión actual")
-    print("0. Salir")
-    print("─"*70)
+    sys.stdout.write(_MENU)
 
 
 def execute_simulations(system, samples, logger, show_details=True):
@@ -67,7 +86,7 @@ def execute_simulations(system, samples, logger, show_details=True):
     
     Args:
         system: Sistema de control difuso
-        samples: Lista de casos de prueba
+        samples: Casos de prueba (Samples, formato columnar)
         logger: DataLogger para registrar resultados
         show_details: Si True, muestra detalles de cada simulación
     
@@ -75,51 +94,127 @@ def execute_simulations(system, samples, logger, show_details=True):
         list: Lista de resultados
     """
     results = []
+    logged = []
     
-    print("\n" + "="*70)
-    print("EJECUTANDO SIMULACIONES")
-    print("="*70)
+    # Las líneas de salida se acumulan y se escriben en una sola llamada
+    lines = ["", "="*70, "EJECUTANDO SIMULACIONES", "="*70]
     
-    for i, sample in enumerate(samples, 1):
-        nombre = sample['nombre']
-        humedad = sample['humedad']
-        temperatura = sample['temperatura']
-        radiacion = sample['radiacion']
+    # Validar todos los casos de una vez; los inválidos se informan uno a uno
+    # y no entran en el lote
+    valid = validate_inputs_batch(np.column_stack((samples.h, samples.t, samples.r)))
+    
+    # Ejecutar todas las simulaciones válidas a la vez sobre las columnas del conjunto
+    durations = np.full(len(samples), np.nan)
+    if valid.any():
+        try:
+            durations[valid] = simulate_irrigation_batch(samples.h[valid], samples.t[valid],
+                                                         samples.r[valid])
+        except Exception as e:
+            lines.append(f"  └─ Error: {str(e)}")
+    
+    rows = zip(samples.names, samples.h, samples.t, samples.r, durations)
+    for i, (nombre, humedad, temperatura, radiacion, duracion) in enumerate(rows, 1):
+        if show_details:
+            lines.append(f"\n[{i}/{len(samples)}] {nombre}")
+            lines.append(f"  └─ Entradas: H={humedad:g}%, T={temperatura:g}°C, R={radiacion:g} W/m²")
+        
+        if not valid[i - 1]:
+            _, mensaje = validate_input(humedad, temperatura, radiacion)
+            lines.append(f"  └─ Error: {mensaje}")
+            continue
+        
+        if np.isnan(duracion):
+            lines.append("  └─ Error: Salida de inferencia no disponible")
+            continue
+        
+        duracion = float(duracion)
         
         if show_details:
-            print(f"\n[{i}/{len(samples)}] {nombre}")
-            print(f"  └─ Entradas: H={humedad}%, T={temperatura}°C, R={radiacion} W/m²")
+            lines.append(f"  └─ Salida: Duración del riego = {duracion:.2f} minutos")
         
-        try:
-            # Ejecutar simulación
-            duracion = simulate_irrigation(system, humedad, temperatura, radiacion)
-            
-            if show_details:
-                print(f"  └─ Salida: Duración del riego = {duracion:.2f} minutos")
-            
-            # Registrar resultado
-            logger.log_simulation(sample, duracion)
-            
-            # Guardar para comparación
-            result = {
-                'nombre': nombre,
-                'humedad': humedad,
-                'temperatura': temperatura,
-                'radiacion': radiacion,
-                'duracion': duracion
-            }
-            results.append(result)
-            
-        except Exception as e:
-            print(f"  └─ Error: {str(e)}")
+        result = {
+            'nombre': nombre,
+            'humedad': float(humedad),
+            'temperatura': float(temperatura),
+            'radiacion': float(radiacion),
+            'duracion': duracion
+        }
+        
+        # Guardar para registro y comparación
+        logged.append((result, duracion))
+        results.append(result)
     
-    print("\n" + "="*70)
-    print(f"✓ Simulaciones completadas: {len(results)}/{len(samples)}")
-    print("="*70)
+    # Registrar todos los resultados con una sola escritura
+    if logged:
+        logger.log_batch(logged)
+    
+    lines.append("\n" + "="*70)
+    lines.append(f"✓ Simulaciones completadas: {len(results)}/{len(samples)}")
+    lines.append("="*70)
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return results
 
 
+def compute_surface(sub_opcion, var_x, var_y, fixed_var, fixed_value, cache_dir='logs'):
+    """
+    Evalúa la superficie de control en una sola llamada por lotes, reutilizando
+    el resultado guardado en disco si ya se calculó con el mismo valor fijo, el
+    mismo modelo (reglas y funciones de pertenencia) y la misma malla.
+    
+    Args:
+        sub_opcion: Sub-opción del menú que identifica el par de variables
+        var_x: Variable del eje X
+        var_y: Variable del eje Y
+        fixed_var: Variable mantenida fija
+        fixed_value: Valor de la variable fija (se redondea a 0.1)
+        cache_dir: Directorio donde se guardan las mallas calculadas
+    
+    Returns:
+        tuple: (x_mesh, y_mesh, z_output)
+        
+    Raises:
+        ValueError: Si el valor fijo está fuera del rango de su variable
+    """
+    fixed_value = round(fixed_value, 1)
+    
+    # Validar el valor fijo antes de construir la malla; las variables de los
+    # ejes se completan con 0, que siempre está en rango
+    point = {var_x: 0.0, var_y: 0.0, fixed_var: fixed_value}
+    es_valido, mensaje = validate_input(point['soil_moisture'], point['temperature'],
+                                        point['solar_radiation'])
+    if not es_valido:
+        raise ValueError(mensaje)
+    
+    from utils.visualization import surface_mesh
+    
+    x_mesh, y_mesh = surface_mesh(var_x, var_y)
+    
+    # La clave incluye la huella del modelo y de la malla, para no servir
+    # superficies calculadas con otras reglas, funciones o rangos
+    grid_hash = hashlib.sha1(x_mesh.tobytes() + y_mesh.tobytes()).hexdigest()[:8]
+    cache_file = os.path.join(cache_dir, f"surface_cache_{sub_opcion}_{fixed_value}_"
+                                         f"{model_signature()}_{grid_hash}.npz")
+    
+    if os.path.exists(cache_file):
+        print(f"\nSuperficie recuperada de caché: {cache_file}")
+        with np.load(cache_file) as data:
+            return x_mesh, y_mesh, data['z']
+    
+    print(f"\nCalculando superficie 3D ({x_mesh.size} simulaciones)...")
+    inputs = {
+        var_x: x_mesh.ravel(),
+        var_y: y_mesh.ravel(),
+        fixed_var: np.full(x_mesh.size, fixed_value)
+    }
+    z_output = simulate_irrigation_batch(inputs['soil_moisture'], inputs['temperature'],
+                                         inputs['solar_radiation']).reshape(x_mesh.shape)
+    
+    np.savez(cache_file, z=z_output)
+    
+    return x_mesh, y_mesh, z_output
+
+
 def main():
     """Función principal del programa."""
     
@@ -145,6 +240,8 @@ def main():
     
     # 5. Inicializar logger
     print("  [5/5] Inicializando registro de datos...")
+    from utils.data_logger import DataLogger
+    
     logger = DataLogger(log_dir='logs')
     logger.start_session('riego_invernadero')
     
@@ -178,6 +275,7 @@ def main():
                 # Mostrar comparación gráfica
                 respuesta = input("\n¿Desea ver la comparación gráfica? (s/n): ").strip().lower()
                 if respuesta == 's':
+                    from utils.visualization import plot_multiple_simulations
                     plot_multiple_simulations(results)
             
             elif opcion == '2':
@@ -187,22 +285,25 @@ def main():
                 
                 respuesta = input("\n¿Desea ver la comparación gráfica? (s/n): ").strip().lower()
                 if respuesta == 's':
+                    from utils.visualization import plot_multiple_simulations
                     plot_multiple_simulations(results)
             
             elif opcion == '3':
                 # Entrada personalizada
                 sample = get_custom_input()
                 if sample:
-                    results = execute_simulations(system, [sample], logger)
+                    results = execute_simulations(system, Samples.from_records([sample]), logger)
                     
                     if results:
                         respuesta = input("\n¿Desea ver el resultado gráfico? (s/n): ").strip().lower()
                         if respuesta == 's':
+                            from utils.visualization import plot_simulation_result
                             plot_simulation_result(system, sample, results[0]['duracion'], vars)
             
             elif opcion == '4':
                 # Visualizar funciones de pertenencia
                 print("\nGenerando gráficas de funciones de pertenencia...")
+                from utils.visualization import plot_memberships
                 plot_memberships(vars, save_path='logs/funciones_pertenencia.png')
             
             elif opcion == '5':
@@ -214,21 +315,28 @@ def main():
                 
                 sub_opcion = input("\nSeleccione (1-3): ").strip()
                 
-                if sub_opcion == '1':
-                    rad_fija = float(input("Valor de radiación fija (0-1000): "))
-                    plot_surface(system, vars, 'soil_moisture', 'temperature',
-                               'solar_radiation', rad_fija,
-                               save_path='logs/superficie_humedad_temp.png')
-                elif sub_opcion == '2':
-                    temp_fija = float(input("Valor de temperatura fija (0-40): "))
-                    plot_surface(system, vars, 'soil_moisture', 'solar_radiation',
-                               'temperature', temp_fija,
-                               save_path='logs/superficie_humedad_rad.png')
-                elif sub_opcion == '3':
-                    hum_fija = float(input("Valor de humedad fija (0-100): "))
-                    plot_surface(system, vars, 'temperature', 'solar_radiation',
-                               'soil_moisture', hum_fija,
-                               save_path='logs/superficie_temp_rad.png')
+                surface_options = {
+                    '1': ('soil_moisture', 'temperature', 'solar_radiation',
+                          "Valor de radiación fija (0-1000): ", 'logs/superficie_humedad_temp.png'),
+                    '2': ('soil_moisture', 'solar_radiation', 'temperature',
+                          "Valor de temperatura fija (0-40): ", 'logs/superficie_humedad_rad.png'),
+                    '3': ('temperature', 'solar_radiation', 'soil_moisture',
+                          "Valor de humedad fija (0-100): ", 'logs/superficie_temp_rad.png')
+                }
+                
+                if sub_opcion in surface_options:
+                    var_x, var_y, fixed_var, prompt, save_path = surface_options[sub_opcion]
+                    valor_fijo = float(input(prompt))
+                    try:
+                        x_mesh, y_mesh, z_output = compute_surface(sub_opcion, var_x, var_y,
+                                                                   fixed_var, valor_fijo)
+                    except ValueError as e:
+                        print(f"\nError: {e}")
+                    else:
+                        from utils.visualization import plot_surface_from_array
+                        plot_surface_from_array(x_mesh, y_mesh, z_output, var_x, var_y,
+                                                fixed_var, round(valor_fijo, 1),
+                                                save_path=save_path)
                 else:
                     print("Opción no válida")
             
@@ -239,6 +347,7 @@ def main():
                     duracion = simulate_irrigation(system, sample['humedad'],
                                                   sample['temperatura'], sample['radiacion'])
                     print(f"\nDuración calculada: {duracion:.2f} minutos")
+                    from utils.visualization import plot_simulation_result
                     plot_simulation_result(system, sample, duracion, vars)
             
             elif opcion == '7':
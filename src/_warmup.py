@@ -0,0 +1,23 @@
+"""
+Precompilación del evaluador Numba.
+Ejecutar una vez después de instalar las dependencias para generar la caché
+de compilación en disco:
+
+    python src/_warmup.py
+"""
+from system.fast_controller import compute_irrigation
+
+
+def warmup():
+    """
+    Invoca cada función compilada con argumentos representativos para
+    materializar la caché de Numba.
+    """
+    compute_irrigation(15.0, 35.0, 900.0)
+    compute_irrigation(60.0, 22.0, 500.0)
+    compute_irrigation(80.0, 20.0, 400.0)
+
+
+if __name__ == '__main__':
+    warmup()
+    print("✓ Evaluador compilado y guardado en caché")
@@ -2,8 +2,34 @@
 Construcción y ejecución del sistema de control difuso Mamdani.
 Crea el sistema de inferencia y ejecuta simulaciones.
 """
+import functools
+import hashlib
+import weakref
+
+import numpy as np
 from skfuzzy import control as ctrl
 
+from .membership_functions import _FUZZ_MF, _MF_SPECS, define_memberships, eval_mf
+from .rules import _RULE_SPECS
+from .variables import define_universes
+
+
+# ============================================
+# UNIVERSO DE SALIDA PARA INFERENCIA POR LOTES
+# ============================================
+# En float32 para reducir a la mitad el tamaño del arreglo agregado (N, 301)
+DUR_GRID = np.linspace(0, 30, 301, dtype=np.float32)
+
+# Funciones de pertenencia de salida sobre la malla, tomadas de _MF_SPECS
+_MU_OUT = {
+    term: _FUZZ_MF[kind](DUR_GRID, list(params)).astype(np.float32)
+    for term, kind, params in _MF_SPECS['irrigation_duration']
+}
+MU_MUY_CORTA = _MU_OUT['muy_corta']
+MU_CORTA = _MU_OUT['corta']
+MU_MEDIA = _MU_OUT['media']
+MU_LARGA = _MU_OUT['larga']
+
 
 def build_system(rules):
     """
@@ -24,12 +50,24 @@ def build_system(rules):
     return simulation
 
 
+def _raise_range_error(humedad, temperatura, radiacion):
+    """Lanza el ValueError correspondiente a la primera entrada fuera de rango."""
+    if not (0 <= humedad <= 100):
+        raise ValueError(f"Humedad fuera de rango: {humedad}. Debe estar entre 0-100%")
+    
+    if not (0 <= temperatura <= 40):
+        raise ValueError(f"Temperatura fuera de rango: {temperatura}. Debe estar entre 0-40°C")
+    
+    raise ValueError(f"Radiación fuera de rango: {radiacion}. Debe estar entre 0-1000 W/m²")
+
+
 def simulate_irrigation(system, humedad, temperatura, radiacion):
     """
     Ejecuta la simulación con valores específicos de las variables de entrada.
     
     Args:
         system (ctrl.ControlSystemSimulation): Sistema de control difuso
+            (se conserva por compatibilidad; la inferencia usa fast_controller)
         humedad (float): Valor de humedad del suelo (0-100%)
         temperatura (float): Valor de temperatura ambiente (0-40°C)
         radiacion (float): Valor de radiación solar (0-1000 W/m²)
@@ -39,42 +77,287 @@ def simulate_irrigation(system, humedad, temperatura, radiacion):
         
     Raises:
         ValueError: Si los valores de entrada están fuera de rango
+        RuntimeError: Si ninguna regla se activa para las entradas
     """
-    # Validar rangos de entrada
-    if not (0 <= humedad <= 100):
-        raise ValueError(f"Humedad fuera de rango: {humedad}. Debe estar entre 0-100%")
-    
-    if not (0 <= temperatura <= 40):
-        raise ValueError(f"Temperatura fuera de rango: {temperatura}. Debe estar entre 0-40°C")
+    # Validar rangos de entrada en una sola expresión (& no cortocircuita); el
+    # mensaje detallado solo se construye si la validación falla
+    if not ((0 <= humedad) & (humedad <= 100)
+            & (0 <= temperatura) & (temperatura <= 40)
+            & (0 <= radiacion) & (radiacion <= 1000)):
+        _raise_range_error(humedad, temperatura, radiacion)
     
-    if not (0 <= radiacion <= 1000):
-        raise ValueError(f"Radiación fuera de rango: {radiacion}. Debe estar entre 0-1000 W/m²")
+    # Consultar la caché con las entradas exactas; el evaluador compilado solo
+    # se ejecuta ante valores nuevos
+    duration = _simulate_cached(float(humedad), float(temperatura), float(radiacion))
+
+    if np.isnan(duration):
+        raise RuntimeError("Salida de inferencia no disponible: ninguna regla se activó "
+                           "para los valores de entrada")
+
+    return float(duration)
+
+
+def get_input_dict(system):
+    """
+    Obtiene referencias directas al almacenamiento interno de las entradas de
+    cada antecedente del sistema de scikit-fuzzy, junto con los límites de su
+    universo.
     
-    # Asignar valores de entrada al sistema
-    system.input['soil_moisture'] = humedad
-    system.input['temperature'] = temperatura
-    system.input['solar_radiation'] = radiacion
+    Args:
+        system (ctrl.ControlSystemSimulation): Sistema de control difuso
+        
+    Returns:
+        dict: {etiqueta del antecedente: (dict interno de estado, mínimo,
+            máximo)}, o None si la versión de scikit-fuzzy no expone ese
+            almacenamiento
+    """
+    try:
+        return {ant.label: (ant.input._sim_data,
+                            float(ant.universe.min()), float(ant.universe.max()))
+                for ant in system.ctrl.antecedents}
+    except AttributeError:
+        return None
+
+
+def simulate_irrigation_fast(system, input_dict, humedad, temperatura, radiacion):
+    """
+    Ejecuta el motor de scikit-fuzzy asignando las entradas directamente en su
+    almacenamiento interno, sin la búsqueda de system.input[...]. Como hace
+    scikit-fuzzy (clip_to_bounds), los valores se recortan a los universos.
     
-    # Ejecutar el motor de inferencia
+    Args:
+        system (ctrl.ControlSystemSimulation): Sistema de control difuso
+        input_dict (dict): Resultado de get_input_dict(system)
+        humedad (float): Valor de humedad del suelo (0-100%)
+        temperatura (float): Valor de temperatura ambiente (0-40°C)
+        radiacion (float): Valor de radiación solar (0-1000 W/m²)
+        
+    Returns:
+        float: Valor defuzzificado de la duración del riego (minutos)
+        
+    Raises:
+        RuntimeError: Si ninguna regla se activa para las entradas
+    """
     try:
-        system.compute()
-    except Exception as e:
-        raise RuntimeError(f"Error en la inferencia difusa: {str(e)}")
-    # Obtener y retornar el valor defuzzificado
+        sm_data, sm_min, sm_max = input_dict['soil_moisture']
+        t_data, t_min, t_max = input_dict['temperature']
+        r_data, r_min, r_max = input_dict['solar_radiation']
+        humedad = min(max(humedad, sm_min), sm_max)
+        temperatura = min(max(temperatura, t_min), t_max)
+        radiacion = min(max(radiacion, r_min), r_max)
+        sm_data['current'] = humedad
+        t_data['current'] = temperatura
+        r_data['current'] = radiacion
+        # Identificador de estado equivalente al que calcula scikit-fuzzy
+        system.unique_id = str(id(system.ctrl)) + str(hash((humedad, temperatura, radiacion)))
+    except (TypeError, KeyError):
+        # Sin acceso directo: usar la vía pública
+        system.input['soil_moisture'] = humedad
+        system.input['temperature'] = temperatura
+        system.input['solar_radiation'] = radiacion
+    
+    system.compute()
+    
     try:
-        duration = system.output['irrigation_duration']
+        return float(system.output['irrigation_duration'])
     except KeyError:
-        # Si por alguna razón la clave no existe, intentar obtener el primer
-        # valor disponible en system.output y devolverlo (mejor mensaje para el
-        # usuario que un KeyError crudo).
-        try:
-            # system.output es similar a un dict; tomar el primer valor
-            first_val = next(iter(system.output.values()))
-            return float(first_val)
-        except Exception:
-            raise RuntimeError("Salida de inferencia no disponible: 'irrigation_duration' no encontrada")
+        raise RuntimeError("Salida de inferencia no disponible: 'irrigation_duration' no encontrada")
 
-    return float(duration)
+
+@functools.lru_cache(maxsize=4096)
+def _simulate_cached(humedad, temperatura, radiacion):
+    """
+    Ejecuta la inferencia y memoriza el resultado por valor de entrada.
+    
+    Args:
+        humedad (float): Humedad del suelo (0-100%)
+        temperatura (float): Temperatura ambiente (0-40°C)
+        radiacion (float): Radiación solar (0-1000 W/m²)
+        
+    Returns:
+        float: Duración del riego (minutos), o NaN si ninguna regla se activa
+    """
+    # Importación diferida: Numba solo se carga cuando hay una simulación real
+    try:
+        from .fast_controller import compute_irrigation
+    except ImportError:
+        return _simulate_python(humedad, temperatura, radiacion)
+    
+    return float(compute_irrigation(humedad, temperatura, radiacion))
+
+
+@functools.lru_cache(maxsize=1)
+def _fallback_vars():
+    """Variables difusas usadas por la evaluación sin Numba (se crean una vez)."""
+    return define_memberships(define_universes())
+
+
+def _simulate_python(humedad, temperatura, radiacion):
+    """
+    Evaluación Mamdani en NumPy, usada cuando Numba no está disponible.
+    
+    Returns:
+        float: Duración del riego (minutos), o NaN si ninguna regla se activa
+    """
+    vars = _fallback_vars()
+    
+    # Fuzzificación mediante las tablas precalculadas de cada término
+    mu_in = {}
+    for var_name, value in (('soil_moisture', humedad),
+                            ('temperature', temperatura),
+                            ('solar_radiation', radiacion)):
+        var = getattr(vars, var_name)
+        for term in var.terms:
+            mu_in[(var_name, term)] = eval_mf(var, term, value)
+    
+    # Evaluación de reglas (AND = mínimo) y acumulación (OR = máximo)
+    alpha = {'muy_corta': 0.0, 'corta': 0.0, 'media': 0.0, 'larga': 0.0}
+    for antecedents, (_, out_term), _ in _RULE_SPECS:
+        alpha[out_term] = max(alpha[out_term], min(mu_in[term] for term in antecedents))
+    
+    # Implicación, agregación y centroide sobre la malla de salida
+    aggregated = np.maximum.reduce([
+        np.minimum(alpha['muy_corta'], MU_MUY_CORTA),
+        np.minimum(alpha['corta'], MU_CORTA),
+        np.minimum(alpha['media'], MU_MEDIA),
+        np.minimum(alpha['larga'], MU_LARGA)
+    ])
+    den = aggregated.sum()
+    if den == 0:
+        return np.nan
+    return float(aggregated @ DUR_GRID / den)
+
+
+def clear_cache():
+    """Vacía la caché de resultados de simulate_irrigation."""
+    _simulate_cached.cache_clear()
+
+
+def _trapmf_batch(x, a, b, c, d):
+    """Grado de pertenencia trapezoidal evaluado sobre un arreglo de entradas."""
+    left = np.where(x >= a, 1.0, 0.0) if b == a else (x - a) / (b - a)
+    right = np.where(x <= d, 1.0, 0.0) if d == c else (d - x) / (d - c)
+    return np.clip(np.minimum(left, right), 0.0, 1.0)
+
+
+def _trimf_batch(x, a, b, c):
+    """Grado de pertenencia triangular evaluado sobre un arreglo de entradas."""
+    return _trapmf_batch(x, a, b, b, c)
+
+
+# Funciones de pertenencia de entrada de la inferencia por lotes, tomadas de
+# _MF_SPECS: {(variable, término): (tipo, parámetros)}
+_INPUT_MF_PARAMS = {
+    (var, term): (kind, params)
+    for var in ('soil_moisture', 'temperature', 'solar_radiation')
+    for term, kind, params in _MF_SPECS[var]
+}
+
+_MF_BATCH = {'trap': _trapmf_batch, 'tri': _trimf_batch}
+
+
+@functools.lru_cache(maxsize=1)
+def model_signature():
+    """
+    Huella del modelo usado por simulate_irrigation_batch y el evaluador
+    compilado (tablas de reglas y de funciones de pertenencia, y malla de
+    salida). Cambia cuando se edita cualquiera de ellos, por lo que sirve para
+    invalidar resultados guardados en disco.
+    
+    Returns:
+        str: Resumen hexadecimal de 12 caracteres
+    """
+    digest = hashlib.sha1(repr((_RULE_SPECS, _MF_SPECS)).encode('utf-8'))
+    digest.update(DUR_GRID.tobytes())
+    return digest.hexdigest()[:12]
+
+
+def simulate_irrigation_batch(h_arr, t_arr, r_arr):
+    """
+    Ejecuta la inferencia para N casos a la vez usando operaciones vectorizadas.
+    
+    Args:
+        h_arr (array-like): Humedades del suelo (0-100%), forma (N,)
+        t_arr (array-like): Temperaturas ambiente (0-40°C), forma (N,)
+        r_arr (array-like): Radiaciones solares (0-1000 W/m²), forma (N,)
+        
+    Returns:
+        np.ndarray: Duraciones del riego (minutos), forma (N,). Los casos en los
+            que ninguna regla se activa quedan como NaN.
+        
+    Raises:
+        ValueError: Si algún valor de entrada está fuera de rango
+    """
+    h = np.asarray(h_arr, dtype=np.float64)
+    t = np.asarray(t_arr, dtype=np.float64)
+    r = np.asarray(r_arr, dtype=np.float64)
+    
+    # Validar rangos de entrada (escritos en positivo para que NaN no pase)
+    if np.any(~((h >= 0) & (h <= 100))):
+        raise ValueError("Humedad fuera de rango en el lote. Debe estar entre 0-100%")
+    if np.any(~((t >= 0) & (t <= 40))):
+        raise ValueError("Temperatura fuera de rango en el lote. Debe estar entre 0-40°C")
+    if np.any(~((r >= 0) & (r <= 1000))):
+        raise ValueError("Radiación fuera de rango en el lote. Debe estar entre 0-1000 W/m²")
+    
+    # Fuzzificación de las entradas, forma (N,)
+    inputs = {'soil_moisture': h, 'temperature': t, 'solar_radiation': r}
+    mu_in = {
+        key: _MF_BATCH[kind](inputs[key[0]], *params)
+        for key, (kind, params) in _INPUT_MF_PARAMS.items()
+    }
+    
+    # Fuerza de activación de cada regla (AND = mínimo) y acumulación por
+    # término de salida (OR = máximo)
+    alpha = {term: np.zeros(h.shape) for term in ('muy_corta', 'corta', 'media', 'larga')}
+    for antecedents, (_, out_term), _ in _RULE_SPECS:
+        strength = np.minimum.reduce([mu_in[term] for term in antecedents])
+        np.maximum(alpha[out_term], strength, out=alpha[out_term])
+    
+    # Implicación (recorte) y agregación en float32, forma (N, 301)
+    alphas = np.array([alpha['muy_corta'], alpha['corta'], alpha['media'], alpha['larga']],
+                      dtype=np.float32)
+    aggregated = np.maximum.reduce([
+        np.minimum(alphas[0][:, None], MU_MUY_CORTA[None, :]),
+        np.minimum(alphas[1][:, None], MU_CORTA[None, :]),
+        np.minimum(alphas[2][:, None], MU_MEDIA[None, :]),
+        np.minimum(alphas[3][:, None], MU_LARGA[None, :])
+    ])
+    
+    # Defuzzificación por centroide
+    den = aggregated.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        durations = ((aggregated @ DUR_GRID) / den).astype(np.float64)
+    durations[den == 0] = np.nan
+    
+    return durations
+
+
+# Mapeo de nombres internos a nombres legibles
+_NOMBRES_LEGIBLES = (
+    ('soil_moisture', 'Humedad del Suelo (%)'),
+    ('temperature', 'Temperatura Ambiente (°C)'),
+    ('solar_radiation', 'Radiación Solar (W/m²)'),
+    ('irrigation_duration', 'Duración del Riego (min)')
+)
+
+
+def _nombre_legible(label):
+    """Devuelve el nombre legible de una variable, o la etiqueta si no es conocida."""
+    for key, nombre in _NOMBRES_LEGIBLES:
+        if key == label:
+            return nombre
+    return label
+
+
+# Información de cada sistema ya consultado; las reglas no cambian después de
+# build_system, así que basta con calcularla una vez por sistema
+_system_info_cache = weakref.WeakKeyDictionary()
+
+
+def clear_system_info_cache():
+    """Vacía la caché de get_system_info."""
+    _system_info_cache.clear()
 
 
 def get_system_info(system):
@@ -87,24 +370,22 @@ def get_system_info(system):
     Returns:
         dict: Información sobre el sistema (número de reglas, variables, etc.)
     """
+    info = _system_info_cache.get(system)
+    if info is not None:
+        return info
+    
     ctrl_system = system.ctrl
     
     # Convertir generator a lista
     rules_list = list(ctrl_system.rules)
     
-    # Mapeo de nombres internos a nombres legibles
-    nombre_legible = {
-        'soil_moisture': 'Humedad del Suelo (%)',
-        'temperature': 'Temperatura Ambiente (°C)',
-        'solar_radiation': 'Radiación Solar (W/m²)',
-        'irrigation_duration': 'Duración del Riego (min)'
-    }
-    
     info = {
         'num_rules': len(rules_list),
-        'antecedents': [nombre_legible.get(ant.label, ant.label) for ant in ctrl_system.antecedents],
-        'consequents': [nombre_legible.get(cons.label, cons.label) for cons in ctrl_system.consequents],
+        'antecedents': [_nombre_legible(ant.label) for ant in ctrl_system.antecedents],
+        'consequents': [_nombre_legible(cons.label) for cons in ctrl_system.consequents],
         'rules_labels': [rule.label for rule in rules_list if rule.label]
     }
     
+    _system_info_cache[system] = info
+    
     return info
@@ -0,0 +1,206 @@
+"""
+Evaluador Mamdani compilado con Numba.
+Evalúa las funciones de pertenencia de membership_functions._MF_SPECS y la
+tabla de reglas de rules.py, evitando el motor de scikit-fuzzy en cada
+simulación.
+
+Las funciones se compilan con firma explícita y cache=True: la compilación
+ocurre al importar el módulo y se guarda en __pycache__, por lo que solo la
+primera ejecución paga el costo (ver _warmup.py).
+"""
+import numpy as np
+from numba import njit
+
+from .membership_functions import _MF_SPECS
+from .rules import _RULE_SPECS
+
+
+# ============================================
+# TÉRMINOS DE ENTRADA Y SALIDA
+# ============================================
+# Orden fijo en el que el kernel guarda los grados de pertenencia
+_INPUT_TERMS = (
+    ('soil_moisture', 'muy_seca'),
+    ('soil_moisture', 'seca'),
+    ('soil_moisture', 'normal'),
+    ('soil_moisture', 'humeda'),
+    ('temperature', 'frio'),
+    ('temperature', 'templado'),
+    ('temperature', 'caliente'),
+    ('solar_radiation', 'baja'),
+    ('solar_radiation', 'media'),
+    ('solar_radiation', 'alta'),
+)
+
+_OUTPUT_TERMS = ('muy_corta', 'corta', 'media', 'larga')
+
+# Variables de entrada, en el orden de los argumentos (h, t, r) del kernel
+_INPUT_VARS = ('soil_moisture', 'temperature', 'solar_radiation')
+
+
+# ============================================
+# UNIVERSO DE SALIDA (0-30 min, paso 0.1)
+# ============================================
+_GRID_POINTS = 301
+_GRID_STEP = 0.1
+
+
+@njit('float64(float64, float64, float64, float64, float64)', cache=True, inline='always')
+def _trapmf(x, a, b, c, d):
+    """Grado de pertenencia trapezoidal de un escalar."""
+    left = 1.0 if b == a else (x - a) / (b - a)
+    right = 1.0 if d == c else (d - x) / (d - c)
+    return max(0.0, min(left, right, 1.0))
+
+
+def _encode_memberships(mf_specs):
+    """
+    Convierte la tabla de funciones de pertenencia en arreglos para el kernel.
+    Las triangulares (a, b, c) se expresan como trapezoides (a, b, b, c), y las
+    de salida se tabulan una vez sobre la malla de salida.
+    
+    Args:
+        mf_specs (dict): Tabla con el formato de membership_functions._MF_SPECS
+        
+    Returns:
+        tuple: (input_var, input_params, output_mf) donde input_var es un
+            arreglo (10,) con el índice en _INPUT_VARS de cada término de
+            _INPUT_TERMS, input_params un arreglo (10, 4) con sus parámetros y
+            output_mf un arreglo (4, 301) con el grado de pertenencia de cada
+            término de _OUTPUT_TERMS en cada punto de la malla
+    """
+    def trap(kind, params):
+        return (params[0], params[1], params[1], params[2]) if kind == 'tri' else params
+    
+    terms = {(var, term): trap(kind, params)
+             for var, specs in mf_specs.items() for term, kind, params in specs}
+    
+    input_var = np.array([_INPUT_VARS.index(var) for var, _ in _INPUT_TERMS], dtype=np.int64)
+    input_params = np.array([terms[key] for key in _INPUT_TERMS], dtype=np.float64)
+    output_mf = np.array([
+        [_trapmf(j * _GRID_STEP, *terms[('irrigation_duration', term)])
+         for j in range(_GRID_POINTS)]
+        for term in _OUTPUT_TERMS
+    ], dtype=np.float64)
+    
+    return input_var, input_params, output_mf
+
+
+_INPUT_VAR, _INPUT_PARAMS, _OUTPUT_MF = _encode_memberships(_MF_SPECS)
+
+
+def _encode_rules(rule_specs):
+    """
+    Convierte la tabla de reglas en arreglos de índices para el kernel, con
+    las reglas agrupadas por término de salida.
+    
+    Args:
+        rule_specs (tuple): Tabla de reglas con el formato de rules._RULE_SPECS
+        
+    Returns:
+        tuple: (antecedents, offsets) donde antecedents es un arreglo (R, A) con
+            los índices en _INPUT_TERMS de cada antecedente (-1 como relleno),
+            ordenado por término de salida, y offsets un arreglo (5,) tal que las
+            reglas del término _OUTPUT_TERMS[o] ocupan las filas
+            offsets[o]:offsets[o + 1]
+    """
+    width = max(len(antecs) for antecs, _, _ in rule_specs)
+    antecedents = np.full((len(rule_specs), width), -1, dtype=np.int64)
+    offsets = np.zeros(len(_OUTPUT_TERMS) + 1, dtype=np.int64)
+    
+    k = 0
+    for o, output_term in enumerate(_OUTPUT_TERMS):
+        for antecs, (_, out_term), _ in rule_specs:
+            if out_term != output_term:
+                continue
+            for m, term in enumerate(antecs):
+                antecedents[k, m] = _INPUT_TERMS.index(term)
+            k += 1
+        offsets[o + 1] = k
+    
+    return antecedents, offsets
+
+
+_RULE_ANTECEDENTS, _OUTPUT_OFFSETS = _encode_rules(_RULE_SPECS)
+
+
+@njit('float64(float64, float64, float64, int64[:, :], int64[:], '
+      'int64[:], float64[:, :], float64[:, :])', cache=True, fastmath=True)
+def _mamdani(h, t, r, rule_antecedents, output_offsets,
+             input_var, input_params, output_mf):
+    """
+    Kernel de inferencia Mamdani (min/max) con defuzzificación por centroide
+    sobre la malla de 301 puntos. Las reglas y las funciones de pertenencia
+    llegan como arreglos (ver _encode_rules y _encode_memberships), de modo que
+    la caché de compilación no depende de ellas.
+    """
+    # Fuzzificación de las entradas, en el orden de _INPUT_TERMS
+    mu_in = np.empty(10)
+    for i in range(10):
+        v = input_var[i]
+        x = h if v == 0 else (t if v == 1 else r)
+        mu_in[i] = _trapmf(x, input_params[i, 0], input_params[i, 1],
+                           input_params[i, 2], input_params[i, 3])
+
+    # Evaluación de las reglas (AND = mínimo) y acumulación por término de
+    # salida (OR = máximo), recorriendo solo las reglas de cada término. Una
+    # regla se omite si su primer antecedente vale 0.
+    a_muy_corta = 0.0
+    a_corta = 0.0
+    a_media = 0.0
+    a_larga = 0.0
+    for o in range(4):
+        best = 0.0
+        for k in range(output_offsets[o], output_offsets[o + 1]):
+            strength = mu_in[rule_antecedents[k, 0]]
+            if strength == 0.0:
+                continue
+            for m in range(1, rule_antecedents.shape[1]):
+                idx = rule_antecedents[k, m]
+                if idx < 0:
+                    break
+                strength = min(strength, mu_in[idx])
+            best = max(best, strength)
+
+        if o == 0:
+            a_muy_corta = best
+        elif o == 1:
+            a_corta = best
+        elif o == 2:
+            a_media = best
+        else:
+            a_larga = best
+
+    # Implicación (recorte), agregación y centroide en una sola pasada sobre la
+    # malla de salida, sin arreglos intermedios
+    num = 0.0
+    den = 0.0
+    for j in range(_GRID_POINTS):
+        x = j * _GRID_STEP
+        mu = max(min(a_muy_corta, output_mf[0, j]),
+                 min(a_corta, output_mf[1, j]),
+                 min(a_media, output_mf[2, j]),
+                 min(a_larga, output_mf[3, j]))
+        num += x * mu
+        den += mu
+
+    if den == 0.0:
+        return np.nan
+    return num / den
+
+
+def compute_irrigation(h, t, r):
+    """
+    Calcula la duración del riego con las reglas de rules._RULE_SPECS y las
+    funciones de pertenencia de membership_functions._MF_SPECS.
+
+    Args:
+        h (float): Humedad del suelo (0-100%)
+        t (float): Temperatura ambiente (0-40°C)
+        r (float): Radiación solar (0-1000 W/m²)
+
+    Returns:
+        float: Duración del riego en minutos, o NaN si ninguna regla se activa
+    """
+    return _mamdani(h, t, r, _RULE_ANTECEDENTS, _OUTPUT_OFFSETS,
+                    _INPUT_VAR, _INPUT_PARAMS, _OUTPUT_MF)
@@ -2,61 +2,101 @@
 Definición de funciones de pertenencia (membership functions).
 Define las funciones triangulares y trapezoidales para cada variable.
 """
+import numpy as np
 import skfuzzy as fuzz
 
+from .types import FuzzySystem
+
+
+# ============================================
+# PARÁMETROS DE LAS FUNCIONES DE PERTENENCIA
+# ============================================
+# Cada variable describe sus términos como (término, tipo, parámetros), donde
+# el tipo es 'trap' (trapezoidal) o 'tri' (triangular). Es la única fuente de
+# los parámetros: define_memberships, la inferencia por lotes de controller.py
+# y el evaluador compilado de fast_controller.py se construyen a partir de ella.
+_MF_SPECS = {
+    # Humedad del suelo (0-100%)
+    'soil_moisture': (
+        ('muy_seca', 'trap', (0, 0, 10, 20)),
+        ('seca', 'tri', (10, 30, 50)),
+        ('normal', 'tri', (40, 60, 80)),
+        ('humeda', 'trap', (70, 85, 100, 100)),
+    ),
+    
+    # Temperatura (0-40°C)
+    'temperature': (
+        ('frio', 'trap', (0, 0, 10, 15)),
+        ('templado', 'tri', (10, 22, 30)),
+        ('caliente', 'trap', (25, 32, 40, 40)),
+    ),
+    
+    # Radiación solar (0-1000 W/m²)
+    'solar_radiation': (
+        ('baja', 'trap', (0, 0, 200, 350)),
+        ('media', 'tri', (250, 500, 750)),
+        ('alta', 'trap', (650, 800, 1000, 1000)),
+    ),
+    
+    # Duración del riego (0-30 min)
+    'irrigation_duration': (
+        ('muy_corta', 'trap', (0, 0, 3, 6)),
+        ('corta', 'tri', (4, 8, 12)),
+        ('media', 'tri', (10, 17, 24)),
+        ('larga', 'trap', (20, 25, 30, 30)),
+    ),
+}
+
+_FUZZ_MF = {'trap': fuzz.trapmf, 'tri': fuzz.trimf}
+
 
 def define_memberships(universes):
     """
-    Define todas las funciones de pertenencia para las variables de entrada y salida.
+    Define todas las funciones de pertenencia para las variables de entrada y
+    salida a partir de la tabla _MF_SPECS.
     
     Args:
-        universes (dict): Diccionario con las variables Antecedent y Consequent
+        universes (FuzzySystem): Variables Antecedent y Consequent
         
     Returns:
-        dict: Diccionario con las variables configuradas con sus funciones de pertenencia:
+        FuzzySystem: Variables configuradas con sus funciones de pertenencia:
             - 'soil_moisture': con membresías muy_seca, seca, normal, humeda
             - 'temperature': con membresías frio, templado, caliente
             - 'solar_radiation': con membresías baja, media, alta
             - 'irrigation_duration': con membresías muy_corta, corta, media, larga
     """
-    soil_moisture = universes['soil_moisture']
-    temperature = universes['temperature']
-    solar_radiation = universes['solar_radiation']
-    irrigation_duration = universes['irrigation_duration']
-    
-    # ============================================
-    # HUMEDAD DEL SUELO (0-100%)
-    # ============================================
-    soil_moisture['muy_seca'] = fuzz.trapmf(soil_moisture.universe, [0, 0, 10, 20])
-    soil_moisture['seca'] = fuzz.trimf(soil_moisture.universe, [10, 30, 50])
-    soil_moisture['normal'] = fuzz.trimf(soil_moisture.universe, [40, 60, 80])
-    soil_moisture['humeda'] = fuzz.trapmf(soil_moisture.universe, [70, 85, 100, 100])
-    
-    # ============================================
-    # TEMPERATURA (0-40°C)
-    # ============================================
-    temperature['frio'] = fuzz.trapmf(temperature.universe, [0, 0, 10, 15])
-    temperature['templado'] = fuzz.trimf(temperature.universe, [10, 22, 30])
-    temperature['caliente'] = fuzz.trapmf(temperature.universe, [25, 32, 40, 40])
-    
-    # ============================================
-    # RADIACIÓN SOLAR (0-1000 W/m²)
-    # ============================================
-    solar_radiation['baja'] = fuzz.trapmf(solar_radiation.universe, [0, 0, 200, 350])
-    solar_radiation['media'] = fuzz.trimf(solar_radiation.universe, [250, 500, 750])
-    solar_radiation['alta'] = fuzz.trapmf(solar_radiation.universe, [650, 800, 1000, 1000])
-    
-    # ============================================
-    # DURACIÓN DEL RIEGO (0-30 min)
-    # ============================================
-    irrigation_duration['muy_corta'] = fuzz.trapmf(irrigation_duration.universe, [0, 0, 3, 6])
-    irrigation_duration['corta'] = fuzz.trimf(irrigation_duration.universe, [4, 8, 12])
-    irrigation_duration['media'] = fuzz.trimf(irrigation_duration.universe, [10, 17, 24])
-    irrigation_duration['larga'] = fuzz.trapmf(irrigation_duration.universe, [20, 25, 30, 30])
-    
-    return {
-        'soil_moisture': soil_moisture,
-        'temperature': temperature,
-        'solar_radiation': solar_radiation,
-        'irrigation_duration': irrigation_duration
-    }
+    soil_moisture = universes.soil_moisture
+    temperature = universes.temperature
+    solar_radiation = universes.solar_radiation
+    irrigation_duration = universes.irrigation_duration
+    
+    for var in (soil_moisture, temperature, solar_radiation, irrigation_duration):
+        for term, kind, params in _MF_SPECS[var.label]:
+            var[term] = _FUZZ_MF[kind](var.universe, list(params))
+    
+    # Tablas de consulta de cada término para eval_mf
+    for var in (soil_moisture, temperature, solar_radiation, irrigation_duration):
+        var._mf_cache = {name: term.mf for name, term in var.terms.items()}
+    
+    return FuzzySystem(
+        soil_moisture=soil_moisture,
+        temperature=temperature,
+        solar_radiation=solar_radiation,
+        irrigation_duration=irrigation_duration
+    )
+
+
+def eval_mf(var, term, x):
+    """
+    Evalúa el grado de pertenencia de un valor mediante interpolación lineal
+    sobre la tabla precalculada del término.
+    
+    Args:
+        var: Variable difusa configurada por define_memberships
+        term (str): Nombre del término (p. ej. 'muy_seca')
+        x (float o np.ndarray): Valor(es) de entrada
+        
+    Returns:
+        float o np.ndarray: Grado(s) de pertenencia en [0, 1]
+    """
+    return np.interp(x, var.universe, var._mf_cache[term])
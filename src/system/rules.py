@@ -2,124 +2,96 @@
 Definición de reglas difusas del sistema de inferencia Mamdani.
 Contiene las 12 reglas lingüísticas del sistema de riego.
 """
+import operator
+from functools import reduce
+
 from skfuzzy import control as ctrl
 
 
-def define_rules(vars):
-    """
-    Crea las 12 reglas difusas del sistema de riego para invernadero.
-    
-    Args:
-        vars (dict): Diccionario con las variables difusas (antecedentes y consecuente)
-        
-    Returns:
-        list: Lista de objetos control.Rule del sistema difuso
-    """
-    sm = vars['soil_moisture']  # Humedad del suelo
-    temp = vars['temperature']  # Temperatura
-    rad = vars['solar_radiation']  # Radiación solar
-    duration = vars['irrigation_duration']  # Duración del riego
-    
-    rules = []
-    
-    # ============================================
-    # REGLAS DEL SISTEMA DE RIEGO
-    # ============================================
-    
+# ============================================
+# REGLAS DEL SISTEMA DE RIEGO
+# ============================================
+# Cada regla se describe como (antecedentes, consecuente, etiqueta), donde los
+# antecedentes se combinan con AND. Si la regla usa la humedad, ese término va
+# primero: el evaluador compilado omite la regla cuando su primer término vale 0.
+_RULE_SPECS = (
     # Regla 1: Condiciones extremas de sequía y calor
-    rule1 = ctrl.Rule(
-        sm['muy_seca'] & temp['caliente'] & rad['alta'],
-        duration['larga'],
-        label='R1: Muy seca + Caliente + Radiación alta'
-    )
-    rules.append(rule1)
+    ((('soil_moisture', 'muy_seca'), ('temperature', 'caliente'), ('solar_radiation', 'alta')),
+     ('irrigation_duration', 'larga'),
+     'R1: Muy seca + Caliente + Radiación alta'),
     
     # Regla 2: Muy seca con calor y radiación media
-    rule2 = ctrl.Rule(
-        sm['muy_seca'] & temp['caliente'] & rad['media'],
-        duration['larga'],
-        label='R2: Muy seca + Caliente + Radiación media'
-    )
-    rules.append(rule2)
+    ((('soil_moisture', 'muy_seca'), ('temperature', 'caliente'), ('solar_radiation', 'media')),
+     ('irrigation_duration', 'larga'),
+     'R2: Muy seca + Caliente + Radiación media'),
     
     # Regla 3: Muy seca con temperatura templada
-    rule3 = ctrl.Rule(
-        sm['muy_seca'] & temp['templado'],
-        duration['larga'],
-        label='R3: Muy seca + Templado'
-    )
-    rules.append(rule3)
+    ((('soil_moisture', 'muy_seca'), ('temperature', 'templado')),
+     ('irrigation_duration', 'larga'),
+     'R3: Muy seca + Templado'),
     
     # Regla 4: Seca con temperatura caliente
-    rule4 = ctrl.Rule(
-        sm['seca'] & temp['caliente'],
-        duration['media'],
-        label='R4: Seca + Caliente'
-    )
-    rules.append(rule4)
+    ((('soil_moisture', 'seca'), ('temperature', 'caliente')),
+     ('irrigation_duration', 'media'),
+     'R4: Seca + Caliente'),
     
     # Regla 5: Seca con radiación alta
-    rule5 = ctrl.Rule(
-        sm['seca'] & rad['alta'],
-        duration['media'],
-        label='R5: Seca + Radiación alta'
-    )
-    rules.append(rule5)
+    ((('soil_moisture', 'seca'), ('solar_radiation', 'alta')),
+     ('irrigation_duration', 'media'),
+     'R5: Seca + Radiación alta'),
     
     # Regla 6: Humedad normal pero condiciones extremas
-    rule6 = ctrl.Rule(
-        sm['normal'] & temp['caliente'] & rad['alta'],
-        duration['media'],
-        label='R6: Normal + Caliente + Radiación alta'
-    )
-    rules.append(rule6)
+    ((('soil_moisture', 'normal'), ('temperature', 'caliente'), ('solar_radiation', 'alta')),
+     ('irrigation_duration', 'media'),
+     'R6: Normal + Caliente + Radiación alta'),
     
     # Regla 7: Humedad normal con radiación baja
-    rule7 = ctrl.Rule(
-        sm['normal'] & rad['baja'],
-        duration['corta'],
-        label='R7: Normal + Radiación baja'
-    )
-    rules.append(rule7)
+    ((('soil_moisture', 'normal'), ('solar_radiation', 'baja')),
+     ('irrigation_duration', 'corta'),
+     'R7: Normal + Radiación baja'),
     
     # Regla 8: Suelo húmedo (prioridad máxima - poco riego)
-    rule8 = ctrl.Rule(
-        sm['humeda'],
-        duration['muy_corta'],
-        label='R8: Húmeda'
-    )
-    rules.append(rule8)
+    ((('soil_moisture', 'humeda'),),
+     ('irrigation_duration', 'muy_corta'),
+     'R8: Húmeda'),
     
     # Regla 9: Seca con frío
-    rule9 = ctrl.Rule(
-        sm['seca'] & temp['frio'],
-        duration['corta'],
-        label='R9: Seca + Frío'
-    )
-    rules.append(rule9)
+    ((('soil_moisture', 'seca'), ('temperature', 'frio')),
+     ('irrigation_duration', 'corta'),
+     'R9: Seca + Frío'),
     
     # Regla 10: Muy seca pero con frío
-    rule10 = ctrl.Rule(
-        sm['muy_seca'] & temp['frio'],
-        duration['media'],
-        label='R10: Muy seca + Frío'
-    )
-    rules.append(rule10)
+    ((('soil_moisture', 'muy_seca'), ('temperature', 'frio')),
+     ('irrigation_duration', 'media'),
+     'R10: Muy seca + Frío'),
     
     # Regla 11: Radiación alta con calor (evaporación alta)
-    rule11 = ctrl.Rule(
-        rad['alta'] & temp['caliente'],
-        duration['media'],
-        label='R11: Radiación alta + Caliente'
-    )
-    rules.append(rule11)
+    ((('solar_radiation', 'alta'), ('temperature', 'caliente')),
+     ('irrigation_duration', 'media'),
+     'R11: Radiación alta + Caliente'),
     
     # Regla 12: Condiciones moderadas en todo
-    rule12 = ctrl.Rule(
-        sm['normal'] & temp['templado'] & rad['media'],
-        duration['corta'],
-        label='R12: Normal + Templado + Radiación media'
-    )
-    rules.append(rule12)
+    ((('soil_moisture', 'normal'), ('temperature', 'templado'), ('solar_radiation', 'media')),
+     ('irrigation_duration', 'corta'),
+     'R12: Normal + Templado + Radiación media'),
+)
+
+
+def define_rules(vars):
+    """
+    Crea las 12 reglas difusas del sistema de riego para invernadero a partir
+    de la tabla _RULE_SPECS.
+    
+    Args:
+        vars (FuzzySystem): Variables difusas (antecedentes y consecuente)
+        
+    Returns:
+        list: Lista de objetos control.Rule del sistema difuso
+    """
+    rules = []
+    
+    for antecedents, (out_var, out_term), label in _RULE_SPECS:
+        expr = reduce(operator.and_, (getattr(vars, var)[term] for var, term in antecedents))
+        rules.append(ctrl.Rule(expr, getattr(vars, out_var)[out_term], label=label))
     
     return rules
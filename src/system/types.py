@@ -0,0 +1,25 @@
+"""
+Tipos de datos compartidos por el sistema de control difuso.
+"""
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class FuzzySystem:
+    """
+    Agrupa las variables difusas del sistema de riego.
+    
+    Attributes:
+        soil_moisture: Antecedent para humedad del suelo [0-100]%
+        temperature: Antecedent para temperatura ambiente [0-40]°C
+        solar_radiation: Antecedent para radiación solar [0-1000] W/m²
+        irrigation_duration: Consequent para duración del riego [0-30] min
+    """
+    # __slots__ explícito (dataclass(slots=True) requiere Python 3.10+)
+    __slots__ = ('soil_moisture', 'temperature', 'solar_radiation', 'irrigation_duration')
+    
+    soil_moisture: Any
+    temperature: Any
+    solar_radiation: Any
+    irrigation_duration: Any
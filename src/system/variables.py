@@ -6,29 +6,33 @@ import numpy as np
 import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from .types import FuzzySystem
+
 
 def define_universes():
     """
     Crea y devuelve los universos (rangos numéricos) para cada variable difusa.
     
     Returns:
-        dict: Diccionario con las variables de entrada y salida:
+        FuzzySystem: Variables de entrada y salida:
             - 'soil_moisture': Antecedent para humedad del suelo [0-100]%
             - 'temperature': Antecedent para temperatura ambiente [0-40]°C
             - 'solar_radiation': Antecedent para radiación solar [0-1000] W/m²
             - 'irrigation_duration': Consequent para duración del riego [0-30] min
     """
-    # Variables de entrada (Antecedents)
-    soil_moisture = ctrl.Antecedent(np.arange(0, 101, 1), 'soil_moisture')
-    temperature = ctrl.Antecedent(np.arange(0, 41, 1), 'temperature')
-    solar_radiation = ctrl.Antecedent(np.arange(0, 1001, 10), 'solar_radiation')
+    # Variables de entrada (Antecedents), todas con paso unitario. Se usa
+    # float32: los valores enteros de los universos son exactos en esa precisión
+    soil_moisture = ctrl.Antecedent(np.arange(0, 101, 1, dtype=np.float32), 'soil_moisture')
+    temperature = ctrl.Antecedent(np.arange(0, 41, 1, dtype=np.float32), 'temperature')
+    solar_radiation = ctrl.Antecedent(np.arange(0, 1001, 1, dtype=np.float32), 'solar_radiation')
     
     # Variable de salida (Consequent)
-    irrigation_duration = ctrl.Consequent(np.arange(0, 31, 1), 'irrigation_duration')
+    irrigation_duration = ctrl.Consequent(np.arange(0, 31, 1, dtype=np.float32),
+                                          'irrigation_duration')
     
-    return {
-        'soil_moisture': soil_moisture,
-        'temperature': temperature,
-        'solar_radiation': solar_radiation,
-        'irrigation_duration': irrigation_duration
-    }
+    return FuzzySystem(
+        soil_moisture=soil_moisture,
+        temperature=temperature,
+        solar_radiation=solar_radiation,
+        irrigation_duration=irrigation_duration
+    )
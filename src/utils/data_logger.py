@@ -5,31 +5,122 @@ Guarda datos en formato CSV y JSON para análisis posterior.
 import csv
 import json
 import os
+import sys
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# orjson es opcional: si está instalado se usa para serializar los resúmenes
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj, indent=False):
+    """
+    Serializa un objeto a JSON en UTF-8 (sin escapar caracteres no ASCII).
+    
+    Args:
+        obj: Objeto a serializar
+        indent (bool): Si True, indenta con 2 espacios
+        
+    Returns:
+        bytes: Documento JSON codificado
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data):
+    """
+    Interpreta un documento JSON codificado en UTF-8 (orjson si está disponible).
+    
+    Raises:
+        json.JSONDecodeError: Si el documento no es JSON válido
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def _stats(xs):
+    """
+    Calcula mínimo, máximo y suma de una secuencia no vacía en una sola pasada.
+    
+    Args:
+        xs (iterable): Valores numéricos
+        
+    Returns:
+        tuple: (mínimo, máximo, suma, cantidad)
+    """
+    it = iter(xs)
+    mn = mx = total = next(it)
+    n = 1
+    for x in it:
+        total += x
+        if x < mn:
+            mn = x
+        elif x > mx:
+            mx = x
+        n += 1
+    return mn, mx, total, n
+
+
+def _close_csv(fh, writer, pending_rows):
+    """Escribe los registros pendientes y cierra el CSV de una sesión."""
+    if pending_rows:
+        writer.writerows(pending_rows)
+        pending_rows.clear()
+    fh.close()
+
 
 class DataLogger:
     """
     Clase para registrar y almacenar resultados de simulaciones del sistema de riego.
     """
     
-    def __init__(self, log_dir='logs'):
+    # Claves de los registros, en el orden de las columnas del CSV
+    _FIELDNAMES = ('timestamp', 'caso', 'humedad', 'temperatura', 'radiacion',
+                   'duracion', 'notas')
+    
+    # Encabezados escritos en el CSV
+    _CSV_HEADER = ('timestamp', 'caso', 'humedad_suelo_%', 'temperatura_C',
+                   'radiacion_W_m2', 'duracion_riego_min', 'notas')
+    
+    def __init__(self, log_dir='logs', batch_size=128):
         """
         Inicializa el logger de datos.
         
         Args:
             log_dir (str): Directorio donde se guardarán los logs
+            batch_size (int): Filas acumuladas en memoria antes de escribirlas
+                en el CSV
         """
         self.log_dir = log_dir
+        self.batch_size = batch_size
         self.csv_file = None
         self.json_file = None
         self.session_id = None
-        self.results = []
+        self._reset_stats()
+        
+        # Archivo CSV abierto durante toda la sesión y registros pendientes de escribir
+        self._csv_fh = None
+        self._csv_writer = None
+        self._pending_rows = []
+        
+        # Última marca de tiempo formateada (resolución de segundos)
+        self._last_ts_int = None
+        self._last_ts_str = None
         
-        # Crear directorio de logs si no existe
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            print(f"✓ Directorio de logs creado: {log_dir}")
+        # Cierre del CSV si el logger se descarta o el intérprete termina sin
+        # llamar a close(); se crea en start_session
+        self._finalizer = None
     
     def start_session(self, session_name=None):
         """
@@ -38,6 +129,9 @@ class DataLogger:
         Args:
             session_name (str, optional): Nombre personalizado para la sesión
         """
+        # Cerrar el CSV de la sesión anterior, si lo hay
+        self.close()
+        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         if session_name:
@@ -45,23 +139,68 @@ class DataLogger:
         else:
             self.session_id = f"session_{timestamp}"
         
+        # Crear directorio de logs si no existe (solo al usarlo)
+        os.makedirs(self.log_dir, exist_ok=True)
+        
         # Configurar nombres de archivos
         self.csv_file = os.path.join(self.log_dir, f"{self.session_id}.csv")
         self.json_file = os.path.join(self.log_dir, f"{self.session_id}.json")
         
-        # Crear archivo CSV con encabezados
-        with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'timestamp', 'caso', 'humedad_suelo_%', 'temperatura_C',
-                'radiacion_W_m2', 'duracion_riego_min', 'notas'
-            ])
+        # Crear archivo CSV con encabezados; queda abierto hasta close()
+        self._csv_fh = open(self.csv_file, 'w', newline='', encoding='utf-8',
+                            buffering=1 << 16)
+        csv.writer(self._csv_fh).writerow(self._CSV_HEADER)
+        self._csv_writer = csv.DictWriter(self._csv_fh, fieldnames=self._FIELDNAMES,
+                                          extrasaction='ignore')
+        
+        # Garantizar que las filas pendientes lleguen al disco; el finalizador
+        # no retiene al logger, que puede liberarse normalmente
+        self._finalizer = weakref.finalize(self, _close_csv, self._csv_fh,
+                                           self._csv_writer, self._pending_rows)
         
         print(f"\n✓ Sesión iniciada: {self.session_id}")
         print(f"  - CSV: {self.csv_file}")
         print(f"  - JSON: {self.json_file}")
         
-        self.results = []
+        self._reset_stats()
+    
+    def _reset_stats(self):
+        """Reinicia las estadísticas acumuladas de la sesión."""
+        self._count = 0
+        self._sum = 0.0
+        self._min = None
+        self._max = None
+        self._first_ts = None
+        self._last_ts = None
+    
+    def _update_stats(self, record):
+        """Incorpora un registro a las estadísticas acumuladas."""
+        duracion = record['duracion']
+        if self._count == 0:
+            self._min = self._max = duracion
+            self._first_ts = record['timestamp']
+        else:
+            if duracion < self._min:
+                self._min = duracion
+            elif duracion > self._max:
+                self._max = duracion
+        self._count += 1
+        self._sum += duracion
+        self._last_ts = record['timestamp']
+    
+    def _update_stats_batch(self, records):
+        """Incorpora una lista no vacía de registros a las estadísticas acumuladas."""
+        mn, mx, total, n = _stats(r['duracion'] for r in records)
+        if self._count == 0:
+            self._min = mn
+            self._max = mx
+            self._first_ts = records[0]['timestamp']
+        else:
+            self._min = min(self._min, mn)
+            self._max = max(self._max, mx)
+        self._count += n
+        self._sum += total
+        self._last_ts = records[-1]['timestamp']
     
     def log_simulation(self, input_values, output_value, notes=''):
         """
@@ -76,11 +215,76 @@ class DataLogger:
             print("Advertencia: No hay sesión activa. Iniciando sesión automática...")
             self.start_session()
         
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        record = self._build_record(input_values, output_value, notes)
+        
+        # Actualizar estadísticas (los registros solo se conservan en el CSV)
+        self._update_stats(record)
+        
+        # Acumular la fila; se escribe en el CSV por lotes
+        self._pending_rows.append(record)
+        if len(self._pending_rows) >= self.batch_size:
+            self.flush()
+        
+        return record
+    
+    def log_batch(self, results_list, notes=''):
+        """
+        Registra varias simulaciones de una vez.
+        
+        Args:
+            results_list (list): Lista de tuplas (input_values, output_value)
+            notes (str, optional): Notas aplicadas a todos los registros
+            
+        Returns:
+            list: Registros creados
+        """
+        if not self.session_id:
+            print("Advertencia: No hay sesión activa. Iniciando sesión automática...")
+            self.start_session()
+        
+        records = [self._build_record(input_values, output_value, notes)
+                   for input_values, output_value in results_list]
+        
+        # Actualizar estadísticas (los registros solo se conservan en el CSV)
+        if records:
+            self._update_stats_batch(records)
+        
+        # Acumular las filas; se escriben en el CSV por lotes
+        self._pending_rows.extend(records)
+        if len(self._pending_rows) >= self.batch_size:
+            self.flush()
+        
+        return records
+    
+    def flush(self):
+        """
+        Escribe en el CSV las filas pendientes.
+        """
+        if self._csv_writer is None:
+            return
+        
+        if self._pending_rows:
+            self._csv_writer.writerows(self._pending_rows)
+            self._pending_rows.clear()
+        self._csv_fh.flush()
+    
+    def close(self):
+        """
+        Escribe las filas pendientes y cierra el CSV de la sesión.
+        """
+        if self._csv_fh is None:
+            return
         
-        # Crear registro
-        record = {
-            'timestamp': timestamp,
+        # Escribe lo pendiente y cierra el archivo (solo se ejecuta una vez)
+        self._finalizer()
+        self._finalizer = None
+        self._csv_fh = None
+        self._csv_writer = None
+    
+    def _build_record(self, input_values, output_value, notes):
+        """Crea el diccionario de registro de una simulación."""
+        return {
+            'timestamp': self._timestamp(),
             'caso': input_values.get('nombre', 'Sin nombre'),
             'humedad': input_values.get('humedad', 0),
             'temperatura': input_values.get('temperatura', 0),
@@ -88,24 +292,17 @@ class DataLogger:
             'duracion': round(output_value, 2),
             'notas': notes
         }
-        
-        # Guardar en lista
-        self.results.append(record)
-        
-        # Escribir en CSV
-        with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                record['timestamp'],
-                record['caso'],
-                record['humedad'],
-                record['temperatura'],
-                record['radiacion'],
-                record['duracion'],
-                record['notas']
-            ])
-        
-        return record
+    
+    def _timestamp(self):
+        """
+        Devuelve la hora actual como 'AAAA-MM-DD HH:MM:SS', formateándola solo
+        cuando cambia el segundo.
+        """
+        ts_int = int(time.time())
+        if ts_int != self._last_ts_int:
+            self._last_ts_int = ts_int
+            self._last_ts_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts_int))
+        return self._last_ts_str
     
     def save_summary(self, additional_info=None):
         """
@@ -118,76 +315,113 @@ class DataLogger:
             print("No hay sesión activa para guardar.")
             return
         
-        # Calcular estadísticas
-        duraciones = [r['duracion'] for r in self.results]
+        # Asegurar que el CSV esté completo en disco
+        self.flush()
         
         summary = {
             'session_id': self.session_id,
-            'timestamp_inicio': self.results[0]['timestamp'] if self.results else None,
-            'timestamp_fin': self.results[-1]['timestamp'] if self.results else None,
-            'num_simulaciones': len(self.results),
+            'timestamp_inicio': self._first_ts,
+            'timestamp_fin': self._last_ts,
+            'num_simulaciones': self._count,
             'estadisticas': {
-                'duracion_min': min(duraciones) if duraciones else 0,
-                'duracion_max': max(duraciones) if duraciones else 0,
-                'duracion_promedio': sum(duraciones) / len(duraciones) if duraciones else 0
-            },
-            'resultados': self.results
+                'duracion_min': self._min if self._count else 0,
+                'duracion_max': self._max if self._count else 0,
+                'duracion_promedio': self._sum / self._count if self._count else 0
+            }
         }
         
         if additional_info:
             summary['informacion_adicional'] = additional_info
         
-        # Guardar en JSON
-        with open(self.json_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        # Guardar en JSON: la cabecera se escribe como objeto y los resultados
+        # se copian del CSV registro por registro, sin cargarlos en memoria
+        header = _dumps(summary, indent=True)
+        with open(self.json_file, 'wb') as f:
+            f.write(header[:-2])
+            f.write(b',\n  "resultados": [')
+            for i, record in enumerate(self._iter_records()):
+                f.write(b',\n    ' if i else b'\n    ')
+                f.write(_dumps(record))
+            f.write(b'\n  ]\n}\n' if self._count else b']\n}\n')
         
         print(f"\n✓ Resumen guardado en: {self.json_file}")
-        print(f"  - Total de simulaciones: {len(self.results)}")
+        print(f"  - Total de simulaciones: {self._count}")
         print(f"  - Duración mín/máx/prom: {summary['estadisticas']['duracion_min']:.2f} / "
               f"{summary['estadisticas']['duracion_max']:.2f} / "
               f"{summary['estadisticas']['duracion_promedio']:.2f} min")
         
         return summary
     
+    def _iter_records(self):
+        """
+        Recorre los registros de la sesión leyéndolos del CSV.
+        
+        Yields:
+            dict: Registro con las mismas claves que _build_record
+        """
+        if not self.csv_file or not os.path.exists(self.csv_file):
+            return
+        
+        self.flush()
+        with open(self.csv_file, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # encabezados
+            for row in reader:
+                yield {
+                    'timestamp': row[0],
+                    'caso': row[1],
+                    'humedad': float(row[2]),
+                    'temperatura': float(row[3]),
+                    'radiacion': float(row[4]),
+                    'duracion': float(row[5]),
+                    'notas': row[6]
+                }
+    
     def get_results(self):
         """
         Obtiene todos los resultados registrados en la sesión actual.
         
         Returns:
-            list: Lista de diccionarios con los resultados
+            list: Lista de diccionarios con los resultados, leídos del CSV
         """
-        return self.results
+        return list(self._iter_records())
     
     def print_summary(self):
         """
         Imprime un resumen de la sesión actual en consola.
         """
-        if not self.results:
+        if not self._count:
             print("\nNo hay resultados registrados.")
             return
         
-        print("\n" + "="*70)
-        print(f"RESUMEN DE LA SESIÓN: {self.session_id}")
-        print("="*70)
-        print(f"Total de simulaciones: {len(self.results)}")
-        print("\nResultados:")
-        print("-"*70)
-        print(f"{'#':<4} {'Caso':<25} {'H%':<6} {'T°C':<6} {'R W/m²':<8} {'Dur.(min)':<10}")
-        print("-"*70)
-        
-        for i, r in enumerate(self.results, 1):
-            print(f"{i:<4} {r['caso']:<25} {r['humedad']:<6.1f} {r['temperatura']:<6.1f} "
-                  f"{r['radiacion']:<8.0f} {r['duracion']:<10.2f}")
-        
-        print("-"*70)
-        
-        # Estadísticas
-        duraciones = [r['duracion'] for r in self.results]
-        print(f"\nEstadísticas de Duración:")
-        print(f"  - Mínima:   {min(duraciones):.2f} min")
-        print(f"  - Máxima:   {max(duraciones):.2f} min")
-        print(f"  - Promedio: {sum(duraciones)/len(duraciones):.2f} min")
-        print("="*70)
+        lines = [
+            "\n" + "="*70,
+            f"RESUMEN DE LA SESIÓN: {self.session_id}",
+            "="*70,
+            f"Total de simulaciones: {self._count}",
+            "\nResultados:",
+            "-"*70,
+            f"{'#':<4} {'Caso':<25} {'H%':<6} {'T°C':<6} {'R W/m²':<8} {'Dur.(min)':<10}",
+            "-"*70
+        ]
+        
+        for i, r in enumerate(self._iter_records(), 1):
+            lines.append(f"{i:<4} {r['caso']:<25} {r['humedad']:<6.1f} {r['temperatura']:<6.1f} "
+                         f"{r['radiacion']:<8.0f} {r['duracion']:<10.2f}")
+        
+        lines.append("-"*70)
+        
+        # Estadísticas (acumuladas durante el registro)
+        lines += [
+            "\nEstadísticas de Duración:",
+            f"  - Mínima:   {self._min:.2f} min",
+            f"  - Máxima:   {self._max:.2f} min",
+            f"  - Promedio: {self._sum / self._count:.2f} min",
+            "="*70
+        ]
+        
+        # Una sola escritura en consola
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def load_session(json_file):
@@ -201,8 +435,8 @@ def load_session(json_file):
         dict: Datos de la sesión
     """
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(json_file, 'rb') as f:
+            data = _loads(f.read())
         print(f"✓ Sesión cargada: {data['session_id']}")
         return data
     except FileNotFoundError:
@@ -223,12 +457,9 @@ def compare_sessions(json_files):
     Returns:
         dict: Comparación de sesiones
     """
-    sessions = []
-    
-    for file in json_files:
-        data = load_session(file)
-        if data:
-            sessions.append(data)
+    # Cargar los archivos en paralelo (la lectura es de E/S); map conserva el orden
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(json_files)))) as ex:
+        sessions = [data for data in ex.map(load_session, json_files) if data]
     
     if not sessions:
         print("No se pudieron cargar sesiones para comparar.")
@@ -2,6 +2,92 @@
 Manejo de datos de entrada para el sistema de riego.
 Proporciona funciones para obtener datos de prueba y validación.
 """
+from collections import namedtuple
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# Caso de prueba individual
+Sample = namedtuple('Sample', 'nombre humedad temperatura radiacion')
+
+
+@dataclass
+class Samples:
+    """
+    Conjunto de casos de prueba en formato columnar (un arreglo por variable).
+    
+    Attributes:
+        names (list): Nombres de los casos
+        h (np.ndarray): Humedades del suelo (0-100%)
+        t (np.ndarray): Temperaturas ambiente (0-40°C)
+        r (np.ndarray): Radiaciones solares (0-1000 W/m²)
+    """
+    names: list
+    h: np.ndarray
+    t: np.ndarray
+    r: np.ndarray
+    
+    @classmethod
+    def from_records(cls, records):
+        """
+        Construye el conjunto a partir de una lista de diccionarios con las
+        claves 'nombre', 'humedad', 'temperatura' y 'radiacion'.
+        """
+        return cls(
+            names=[rec['nombre'] for rec in records],
+            h=np.array([rec['humedad'] for rec in records], dtype=np.float64),
+            t=np.array([rec['temperatura'] for rec in records], dtype=np.float64),
+            r=np.array([rec['radiacion'] for rec in records], dtype=np.float64)
+        )
+    
+    @classmethod
+    def from_samples(cls, samples):
+        """
+        Construye un conjunto de solo lectura a partir de una secuencia de Sample.
+        """
+        names, h, t, r = zip(*samples)
+        arrays = [np.array(col, dtype=np.float64) for col in (h, t, r)]
+        for arr in arrays:
+            arr.setflags(write=False)
+        return cls(names=list(names), h=arrays[0], t=arrays[1], r=arrays[2])
+    
+    def __len__(self):
+        return len(self.names)
+
+
+# ============================================
+# CASOS DE PRUEBA
+# ============================================
+_SAMPLES = (
+    # Caso 1: Condiciones extremas - muy seco, muy caliente, alta radiación
+    Sample('Condiciones extremas', 15, 35, 900),
+    # Caso 2: Suelo seco, temperatura media, radiación alta
+    Sample('Seco con radiación alta', 30, 25, 750),
+    # Caso 3: Condiciones normales
+    Sample('Condiciones normales', 60, 22, 500),
+    # Caso 4: Suelo húmedo - poco riego necesario
+    Sample('Suelo húmedo', 80, 20, 400),
+    # Caso 5: Frío con humedad baja
+    Sample('Frío y seco', 25, 12, 300),
+    # Caso 6: Muy seco pero frío
+    Sample('Muy seco pero frío', 10, 8, 200),
+    # Caso 7: Normal con poca radiación
+    Sample('Normal con poca luz', 65, 18, 150),
+    # Caso 8: Calor moderado, seco
+    Sample('Calor moderado y seco', 35, 28, 600),
+)
+
+_EXTREME_CASES = (
+    Sample('Mínimo absoluto', 0, 0, 0),
+    Sample('Máximo absoluto', 100, 40, 1000),
+    Sample('Desierto diurno', 5, 40, 1000),
+    Sample('Invernadero saturado', 95, 15, 100),
+)
+
+# Conjuntos columnares construidos una sola vez (arreglos de solo lectura)
+_SAMPLE_INPUTS = Samples.from_samples(_SAMPLES)
+_EXTREME_INPUTS = Samples.from_samples(_EXTREME_CASES)
 
 
 def get_sample_inputs():
@@ -9,71 +95,23 @@ def get_sample_inputs():
     Devuelve un conjunto de valores de prueba representativos para el sistema.
     
     Returns:
-        list: Lista de diccionarios con casos de prueba:
-            - humedad: 0-100%
-            - temperatura: 0-40°C
-            - radiacion: 0-1000 W/m²
+        Samples: Casos de prueba en formato columnar (compartidos, de solo
+            lectura):
+            - h: humedad 0-100%
+            - t: temperatura 0-40°C
+            - r: radiacion 0-1000 W/m²
     """
-    samples = [
-        # Caso 1: Condiciones extremas - muy seco, muy caliente, alta radiación
-        {
-            'nombre': 'Condiciones extremas',
-            'humedad': 15,
-            'temperatura': 35,
-            'radiacion': 900
-        },
-        # Caso 2: Suelo seco, temperatura media, radiación alta
-        {
-            'nombre': 'Seco con radiación alta',
-            'humedad': 30,
-            'temperatura': 25,
-            'radiacion': 750
-        },
-        # Caso 3: Condiciones normales
-        {
-            'nombre': 'Condiciones normales',
-            'humedad': 60,
-            'temperatura': 22,
-            'radiacion': 500
-        },
-        # Caso 4: Suelo húmedo - poco riego necesario
-        {
-            'nombre': 'Suelo húmedo',
-            'humedad': 80,
-            'temperatura': 20,
-            'radiacion': 400
-        },
-        # Caso 5: Frío con humedad baja
-        {
-            'nombre': 'Frío y seco',
-            'humedad': 25,
-            'temperatura': 12,
-            'radiacion': 300
-        },
-        # Caso 6: Muy seco pero frío
-        {
-            'nombre': 'Muy seco pero frío',
-            'humedad': 10,
-            'temperatura': 8,
-            'radiacion': 200
-        },
-        # Caso 7: Normal con poca radiación
-        {
-            'nombre': 'Normal con poca luz',
-            'humedad': 65,
-            'temperatura': 18,
-            'radiacion': 150
-        },
-        # Caso 8: Calor moderado, seco
-        {
-            'nombre': 'Calor moderado y seco',
-            'humedad': 35,
-            'temperatura': 28,
-            'radiacion': 600
-        }
-    ]
-    
-    return samples
+    return _SAMPLE_INPUTS
+
+
+# Rangos válidos de las entradas: (mínimo, máximo, nombre, unidad)
+_BOUNDS = (
+    (0, 100, 'Humedad', '%'),
+    (0, 40, 'Temperatura', '°C'),
+    (0, 1000, 'Radiación', ' W/m²'),
+)
+_LOWER = np.array([lo for lo, _, _, _ in _BOUNDS], dtype=np.float64)
+_UPPER = np.array([hi for _, hi, _, _ in _BOUNDS], dtype=np.float64)
 
 
 def validate_input(humedad, temperatura, radiacion):
@@ -88,18 +126,32 @@ def validate_input(humedad, temperatura, radiacion):
     Returns:
         tuple: (bool, str) - (es_valido, mensaje_error)
     """
-    if not (0 <= humedad <= 100):
-        return False, f"Humedad ({humedad}%) fuera de rango válido: 0-100%"
+    values = (humedad, temperatura, radiacion)
     
-    if not (0 <= temperatura <= 40):
-        return False, f"Temperatura ({temperatura}°C) fuera de rango válido: 0-40°C"
-    
-    if not (0 <= radiacion <= 1000):
-        return False, f"Radiación ({radiacion} W/m²) fuera de rango válido: 0-1000 W/m²"
+    for value, (lo, hi, name, unit) in zip(values, _BOUNDS):
+        if not (lo <= value <= hi):
+            # El mensaje solo se construye cuando la validación falla
+            return False, f"{name} ({value}{unit}) fuera de rango válido: {lo}-{hi}{unit}"
     
     return True, "Valores válidos"
 
 
+def validate_inputs_batch(arr):
+    """
+    Valida un lote de entradas de una sola vez.
+    
+    Args:
+        arr (np.ndarray): Arreglo (N, 3) con columnas humedad, temperatura y
+            radiación
+        
+    Returns:
+        np.ndarray: Máscara booleana (N,), True donde la fila es válida
+            (los NaN se consideran inválidos)
+    """
+    arr = np.asarray(arr, dtype=np.float64)
+    return np.all((arr >= _LOWER) & (arr <= _UPPER), axis=1)
+
+
 def get_custom_input():
     """
     Solicita valores personalizados al usuario vía consola.
@@ -142,33 +194,6 @@ def get_extreme_cases():
     Devuelve casos extremos para probar los límites del sistema.
     
     Returns:
-        list: Lista de casos extremos
+        Samples: Casos extremos en formato columnar (compartidos, de solo lectura)
     """
-    extreme_cases = [
-        {
-            'nombre': 'Mínimo absoluto',
-            'humedad': 0,
-            'temperatura': 0,
-            'radiacion': 0
-        },
-        {
-            'nombre': 'Máximo absoluto',
-            'humedad': 100,
-            'temperatura': 40,
-            'radiacion': 1000
-        },
-        {
-            'nombre': 'Desierto diurno',
-            'humedad': 5,
-            'temperatura': 40,
-            'radiacion': 1000
-        },
-        {
-            'nombre': 'Invernadero saturado',
-            'humedad': 95,
-            'temperatura': 15,
-            'radiacion': 100
-        }
-    ]
-    
-    return extreme_cases
+    return _EXTREME_INPUTS